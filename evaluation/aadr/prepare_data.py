@@ -1,5 +1,5 @@
 from evaluation_utils.constants import AADR_DIR
-from evaluation_utils.core import download_file
+from evaluation_utils.core import download_files_concurrently
 
 DATA_DIR = AADR_DIR / "data"
 REMOTE_FILES = [
@@ -23,8 +23,8 @@ REMOTE_FILES = [
 
 
 def download_aadr_dataset() -> None:
-    for file_name, url in REMOTE_FILES:
-        download_file(url, DATA_DIR / file_name)
+    # Dataverse limits bandwidth per connection, so overlap the downloads rather than running them one by one
+    download_files_concurrently([(url, DATA_DIR / file_name) for file_name, url in REMOTE_FILES])
 
 
 def main() -> None:
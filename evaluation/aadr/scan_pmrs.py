@@ -1,3 +1,5 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import matplotlib.pyplot as plt
@@ -23,9 +25,13 @@ from evaluation_utils.constants import (
 from evaluation_utils.core import (
     classify_coords,
     ensure_aadr_npz_present,
+    factorize_labels,
     is_archaic_or_reference_sample,
-    load_aadr_metadata,
-    load_aadr_npz_arrays,
+    load_aadr_metadata_frame,
+    load_aadr_packed_pair_arrays,
+    load_aadr_samples,
+    packed_pair_index,
+    unpack_pair_indices,
 )
 
 OUTPUT_DIR = AADR_DIR / "results" / "scans"
@@ -39,71 +45,78 @@ IDENTICAL_PMR_THRESHOLD = 0.14
 NON_IDENTICAL_PMR_THRESHOLD = 0.17
 FIRST_DEGREE_PMR_THRESHOLD = 0.18
 OVERLAP_THRESHOLD = 30000
+METADATA_COLUMN_FIELDS = (
+    INDIVIDUAL_ID_FIELD,
+    PUBLICATION_FIELD,
+    SKELETAL_CODE_FIELD,
+    FULL_DATE_FIELD,
+    GROUP_ID_FIELD,
+    LOCALITY_FIELD,
+    POLITICAL_ENTITY_FIELD,
+    LAT_FIELD,
+    LON_FIELD,
+)
 
 
-def filter_samples(
-    samples: list[str],
-    site_overlaps: np.ndarray,
-    mismatch_rates: np.ndarray,
-    mismatch_rates_95_ci_lower: np.ndarray,
-    mismatch_rates_95_ci_upper: np.ndarray,
-    metadata: dict[str, dict[str, str]],
-    eurasia_only: bool,
-) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+def get_sample_keep_mask(samples: list[str], metadata: pd.DataFrame, eurasia_only: bool) -> np.ndarray:
+    sample_metadata_rows = metadata.loc[samples, [GROUP_ID_FIELD, LAT_FIELD, LON_FIELD]].to_dict(orient="records")
+    keep_mask = np.ones(len(samples), dtype=bool)
     candidate_indices: list[int] = []
     candidate_coords: list[tuple[float, float]] = []
-    for idx, sample in enumerate(samples):
-        if is_archaic_or_reference_sample(sample, metadata[sample]):
+    for idx, (sample, sample_metadata) in enumerate(zip(samples, sample_metadata_rows, strict=True)):
+        if is_archaic_or_reference_sample(sample, sample_metadata):
+            keep_mask[idx] = False
             continue
         try:
-            lat = float(metadata[sample][LAT_FIELD])
-            lon = float(metadata[sample][LON_FIELD])
+            lat = float(sample_metadata[LAT_FIELD])
+            lon = float(sample_metadata[LON_FIELD])
         except (TypeError, ValueError):
+            keep_mask[idx] = False
             continue
         candidate_indices.append(idx)
         candidate_coords.append((lat, lon))
 
     if eurasia_only and candidate_coords:
         regions = classify_coords(candidate_coords)
-        keep_indices = [
-            idx for idx, region in zip(candidate_indices, regions, strict=True) if region in EURASIA_REGIONS
-        ]
-    else:
-        keep_indices = candidate_indices
-
-    keep = np.array(keep_indices, dtype=int)
-    return (
-        [samples[idx] for idx in keep],
-        site_overlaps[np.ix_(keep, keep)],
-        mismatch_rates[np.ix_(keep, keep)],
-        mismatch_rates_95_ci_lower[np.ix_(keep, keep)],
-        mismatch_rates_95_ci_upper[np.ix_(keep, keep)],
-    )
+        for idx, region in zip(candidate_indices, regions, strict=True):
+            if region not in EURASIA_REGIONS:
+                keep_mask[idx] = False
+    return keep_mask
+
+
+def get_metadata_columns(metadata: pd.DataFrame, samples: list[str]) -> dict[str, list[str]]:
+    # Pull the fields the scans need into one list per field, indexed like samples
+    sample_metadata = metadata.loc[samples, list(METADATA_COLUMN_FIELDS)]
+    return {field: sample_metadata[field].tolist() for field in METADATA_COLUMN_FIELDS}
+
 
+def get_pair_metadata(metadata_columns: dict[str, list[str]], idx1: list[int], idx2: list[int]) -> dict[str, list[str]]:
+    def pick(field: str, indices: list[int]) -> list[str]:
+        column = metadata_columns[field]
+        return [column[idx] for idx in indices]
 
-def get_pair_metadata(metadata: dict[str, dict[str, str]], sample1: str, sample2: str) -> dict[str, str]:
     return {
-        "publication1": metadata[sample1][PUBLICATION_FIELD],
-        "publication2": metadata[sample2][PUBLICATION_FIELD],
-        "skeletal_code1": metadata[sample1][SKELETAL_CODE_FIELD],
-        "skeletal_code2": metadata[sample2][SKELETAL_CODE_FIELD],
-        "date1": metadata[sample1][FULL_DATE_FIELD],
-        "date2": metadata[sample2][FULL_DATE_FIELD],
-        "group_id1": metadata[sample1][GROUP_ID_FIELD],
-        "group_id2": metadata[sample2][GROUP_ID_FIELD],
-        "locality1": metadata[sample1][LOCALITY_FIELD],
-        "locality2": metadata[sample2][LOCALITY_FIELD],
-        "political_entity1": metadata[sample1][POLITICAL_ENTITY_FIELD],
-        "political_entity2": metadata[sample2][POLITICAL_ENTITY_FIELD],
-        "lat1": metadata[sample1][LAT_FIELD],
-        "lon1": metadata[sample1][LON_FIELD],
-        "lat2": metadata[sample2][LAT_FIELD],
-        "lon2": metadata[sample2][LON_FIELD],
+        "publication1": pick(PUBLICATION_FIELD, idx1),
+        "publication2": pick(PUBLICATION_FIELD, idx2),
+        "skeletal_code1": pick(SKELETAL_CODE_FIELD, idx1),
+        "skeletal_code2": pick(SKELETAL_CODE_FIELD, idx2),
+        "date1": pick(FULL_DATE_FIELD, idx1),
+        "date2": pick(FULL_DATE_FIELD, idx2),
+        "group_id1": pick(GROUP_ID_FIELD, idx1),
+        "group_id2": pick(GROUP_ID_FIELD, idx2),
+        "locality1": pick(LOCALITY_FIELD, idx1),
+        "locality2": pick(LOCALITY_FIELD, idx2),
+        "political_entity1": pick(POLITICAL_ENTITY_FIELD, idx1),
+        "political_entity2": pick(POLITICAL_ENTITY_FIELD, idx2),
+        "lat1": pick(LAT_FIELD, idx1),
+        "lon1": pick(LON_FIELD, idx1),
+        "lat2": pick(LAT_FIELD, idx2),
+        "lon2": pick(LON_FIELD, idx2),
     }
 
 
 def find_same_individual_id_high_pmr_pairs(
-    metadata: dict[str, dict[str, str]],
+    metadata_columns: dict[str, list[str]],
     samples: list[str],
     individual_ids: list[str],
     site_overlaps: np.ndarray,
@@ -113,42 +126,54 @@ def find_same_individual_id_high_pmr_pairs(
     threshold: float,
     overlap_threshold: int,
 ) -> pd.DataFrame:
-    individual_id_to_indices: dict[str, list[int]] = {}
-    for idx, individual_id in enumerate(individual_ids):
-        if not individual_id:
+    n_samples = len(samples)
+    # Group sample indices by individual ID. Codes are numbered in order of first appearance, so a
+    # stable argsort of the codes lists groups (and indices within each group) in scan order
+    codes = factorize_labels(individual_ids)
+    grouped = np.argsort(codes, kind="stable")
+    grouped = grouped[codes[grouped] >= 0]
+    _, group_starts, group_sizes = np.unique(codes[grouped], return_index=True, return_counts=True)
+
+    matches_i: list[int] = []
+    matches_j: list[int] = []
+    for start, size in zip(group_starts.tolist(), group_sizes.tolist(), strict=True):
+        if size < 2:
             continue
-        individual_id_to_indices.setdefault(individual_id, []).append(idx)
-
-    rows: list[dict[str, str | int | float]] = []
-    for individual_id, indices in individual_id_to_indices.items():
-        if len(indices) < 2:
-            continue
-        for offset, idx_i in enumerate(indices[:-1]):
-            for idx_j in indices[offset + 1 :]:
-                pmr = mismatch_rates[idx_i, idx_j]
-                if np.isnan(pmr):
-                    continue
-                n_overlap = int(site_overlaps[idx_i, idx_j])
-                if n_overlap < overlap_threshold:
-                    continue
-                if pmr > threshold:
-                    row = {
-                        "individual_id": individual_id,
-                        "genetic_id1": samples[idx_i],
-                        "genetic_id2": samples[idx_j],
-                        "site_overlap": n_overlap,
-                        "mismatch_rate": pmr,
-                        "mismatch_rate_95_ci_lower": mismatch_rates_95_ci_lower[idx_i, idx_j],
-                        "mismatch_rate_95_ci_upper": mismatch_rates_95_ci_upper[idx_i, idx_j],
-                    }
-                    row.update(get_pair_metadata(metadata, samples[idx_i], samples[idx_j]))
-                    rows.append(row)
-    rows.sort(key=lambda row: row["mismatch_rate"], reverse=True)
-    return pd.DataFrame.from_records(rows)
+        # Gather every within-group pair at once and only keep the matches
+        group = grouped[start : start + size]
+        pair_i, pair_j = np.triu_indices(len(group), k=1)
+        group_i = group[pair_i]
+        group_j = group[pair_j]
+        pairs = packed_pair_index(n_samples, group_i, group_j)
+        pair_rates = mismatch_rates[pairs]
+        pair_site_overlaps = site_overlaps[pairs]
+        mask = ~np.isnan(pair_rates) & (pair_site_overlaps >= overlap_threshold) & (pair_rates > threshold)
+        matches_i.extend(group_i[mask].tolist())
+        matches_j.extend(group_j[mask].tolist())
+
+    match_i = np.array(matches_i, dtype=np.intp)
+    match_j = np.array(matches_j, dtype=np.intp)
+    match_pairs = packed_pair_index(n_samples, match_i, match_j)
+    # Stable descending sort keeps tied pairs in scan order
+    order = np.argsort(-mismatch_rates[match_pairs], kind="stable")
+    match_pairs = match_pairs[order]
+    idx_i = match_i[order].tolist()
+    idx_j = match_j[order].tolist()
+    columns = {
+        "individual_id": [individual_ids[idx] for idx in idx_i],
+        "genetic_id1": [samples[idx] for idx in idx_i],
+        "genetic_id2": [samples[idx] for idx in idx_j],
+        "site_overlap": site_overlaps[match_pairs],
+        "mismatch_rate": mismatch_rates[match_pairs],
+        "mismatch_rate_95_ci_lower": mismatch_rates_95_ci_lower[match_pairs],
+        "mismatch_rate_95_ci_upper": mismatch_rates_95_ci_upper[match_pairs],
+    }
+    columns.update(get_pair_metadata(metadata_columns, idx_i, idx_j))
+    return pd.DataFrame(columns)
 
 
 def find_diff_individual_id_low_pmr_pairs(
-    metadata: dict[str, dict[str, str]],
+    metadata_columns: dict[str, list[str]],
     samples: list[str],
     individual_ids: list[str],
     site_overlaps: np.ndarray,
@@ -158,43 +183,38 @@ def find_diff_individual_id_low_pmr_pairs(
     threshold: float,
     overlap_threshold: int,
 ) -> pd.DataFrame:
-    individual_ids_array = np.asarray(individual_ids, dtype=object)
-    rows: list[dict[str, str | int | float]] = []
-    for idx_i in range(len(samples) - 1):
-        individual_id_i = individual_ids_array[idx_i]
-        if not individual_id_i:
-            continue
-        row_rates = mismatch_rates[idx_i, idx_i + 1 :]
-        row_overlaps = site_overlaps[idx_i, idx_i + 1 :]
-        row_individual_ids = individual_ids_array[idx_i + 1 :]
-        mask = (
-            (row_individual_ids != "")
-            & (row_individual_ids != individual_id_i)
-            & (row_rates < threshold)
-            & (row_overlaps >= overlap_threshold)
-        )
-        mask &= ~np.isnan(row_rates)
-        match_offsets = np.nonzero(mask)[0]
-        for offset in match_offsets:
-            idx_j = idx_i + 1 + int(offset)
-            row = {
-                "individual_id1": individual_id_i,
-                "individual_id2": row_individual_ids[offset],
-                "genetic_id1": samples[idx_i],
-                "genetic_id2": samples[idx_j],
-                "site_overlap": int(row_overlaps[offset]),
-                "mismatch_rate": row_rates[offset],
-                "mismatch_rate_95_ci_lower": mismatch_rates_95_ci_lower[idx_i, idx_j],
-                "mismatch_rate_95_ci_upper": mismatch_rates_95_ci_upper[idx_i, idx_j],
-            }
-            row.update(get_pair_metadata(metadata, samples[idx_i], samples[idx_j]))
-            rows.append(row)
-    rows.sort(key=lambda row: row["mismatch_rate"])
-    return pd.DataFrame.from_records(rows)
+    individual_id_codes = factorize_labels(individual_ids)
+    # Threshold the packed numeric vectors first, so the per-pair index and ID arrays are only built for
+    # the few candidates rather than for all N * (N - 1) / 2 pairs
+    candidate_mask = (mismatch_rates < threshold) & (site_overlaps >= overlap_threshold)
+    candidate_mask &= ~np.isnan(mismatch_rates)
+    candidate_pairs = np.flatnonzero(candidate_mask)
+    pair_i, pair_j = unpack_pair_indices(len(samples), candidate_pairs)
+    individual_i = individual_id_codes[pair_i]
+    individual_j = individual_id_codes[pair_j]
+    mask = (individual_i >= 0) & (individual_j >= 0) & (individual_i != individual_j)
+
+    match_pairs = candidate_pairs[mask]
+    order = np.argsort(mismatch_rates[match_pairs], kind="stable")
+    match_pairs = match_pairs[order]
+    idx_i = pair_i[mask][order].tolist()
+    idx_j = pair_j[mask][order].tolist()
+    columns = {
+        "individual_id1": [individual_ids[idx] for idx in idx_i],
+        "individual_id2": [individual_ids[idx] for idx in idx_j],
+        "genetic_id1": [samples[idx] for idx in idx_i],
+        "genetic_id2": [samples[idx] for idx in idx_j],
+        "site_overlap": site_overlaps[match_pairs],
+        "mismatch_rate": mismatch_rates[match_pairs],
+        "mismatch_rate_95_ci_lower": mismatch_rates_95_ci_lower[match_pairs],
+        "mismatch_rate_95_ci_upper": mismatch_rates_95_ci_upper[match_pairs],
+    }
+    columns.update(get_pair_metadata(metadata_columns, idx_i, idx_j))
+    return pd.DataFrame(columns)
 
 
 def find_diff_locality_low_pmr_pairs(
-    metadata: dict[str, dict[str, str]],
+    metadata_columns: dict[str, list[str]],
     samples: list[str],
     individual_ids: list[str],
     localities: list[str],
@@ -206,22 +226,27 @@ def find_diff_locality_low_pmr_pairs(
     upper_threshold: float,
     overlap_threshold: int,
 ) -> pd.DataFrame:
-    individual_ids_array = np.asarray(individual_ids, dtype=object)
-    localities_array = np.asarray(localities, dtype=object)
-    rows: list[dict[str, str | int | float]] = []
+    individual_id_codes = factorize_labels(individual_ids)
+    locality_codes = factorize_labels(localities)
+    n_samples = len(samples)
+    matches_i: list[int] = []
+    matches_j: list[int] = []
     for idx_i in range(len(samples) - 1):
-        locality_i = localities_array[idx_i]
-        individual_id_i = individual_ids_array[idx_i]
-        if not locality_i or not individual_id_i:
+        locality_i = locality_codes[idx_i]
+        individual_id_i = individual_id_codes[idx_i]
+        if locality_i < 0 or individual_id_i < 0:
             continue
-        row_rates = mismatch_rates[idx_i, idx_i + 1 :]
-        row_overlaps = site_overlaps[idx_i, idx_i + 1 :]
-        row_localities = localities_array[idx_i + 1 :]
-        row_individual_ids = individual_ids_array[idx_i + 1 :]
+        # Row idx_i's pairs with later samples are contiguous in the packed vectors
+        row_start = packed_pair_index(n_samples, idx_i, idx_i + 1)
+        row_end = row_start + n_samples - idx_i - 1
+        row_rates = mismatch_rates[row_start:row_end]
+        row_overlaps = site_overlaps[row_start:row_end]
+        row_localities = locality_codes[idx_i + 1 :]
+        row_individual_ids = individual_id_codes[idx_i + 1 :]
         mask = (
-            (row_localities != "")
+            (row_localities >= 0)
             & (row_localities != locality_i)
-            & (row_individual_ids != "")
+            & (row_individual_ids >= 0)
             & (row_individual_ids != individual_id_i)
             & (row_rates >= lower_threshold)
             & (row_rates < upper_threshold)
@@ -229,29 +254,44 @@ def find_diff_locality_low_pmr_pairs(
         )
         mask &= ~np.isnan(row_rates)
         match_offsets = np.nonzero(mask)[0]
-        for offset in match_offsets:
-            idx_j = idx_i + 1 + int(offset)
-            row = {
-                "individual_id1": individual_id_i,
-                "individual_id2": row_individual_ids[offset],
-                "genetic_id1": samples[idx_i],
-                "genetic_id2": samples[idx_j],
-                "site_overlap": int(row_overlaps[offset]),
-                "mismatch_rate": row_rates[offset],
-                "mismatch_rate_95_ci_lower": mismatch_rates_95_ci_lower[idx_i, idx_j],
-                "mismatch_rate_95_ci_upper": mismatch_rates_95_ci_upper[idx_i, idx_j],
-            }
-            row.update(get_pair_metadata(metadata, samples[idx_i], samples[idx_j]))
-            row["distance_km"] = round(
+        matches_i.extend([idx_i] * len(match_offsets))
+        matches_j.extend((idx_i + 1 + match_offsets).tolist())
+
+    lats = metadata_columns[LAT_FIELD]
+    lons = metadata_columns[LON_FIELD]
+    distances = np.array(
+        [
+            round(
                 haversine(
-                    (float(row["lat1"]), float(row["lon1"])),
-                    (float(row["lat2"]), float(row["lon2"])),
+                    (float(lats[idx_i]), float(lons[idx_i])),
+                    (float(lats[idx_j]), float(lons[idx_j])),
                     unit="km",
                 )
             )
-            rows.append(row)
-    rows.sort(key=lambda row: row["distance_km"], reverse=True)
-    return pd.DataFrame.from_records(rows)
+            for idx_i, idx_j in zip(matches_i, matches_j, strict=True)
+        ],
+        dtype=np.int64,
+    )
+    # Stable descending sort keeps tied pairs in scan order
+    order = np.argsort(-distances, kind="stable")
+    match_i = np.array(matches_i, dtype=np.intp)[order]
+    match_j = np.array(matches_j, dtype=np.intp)[order]
+    match_pairs = packed_pair_index(n_samples, match_i, match_j)
+    idx_i = match_i.tolist()
+    idx_j = match_j.tolist()
+    columns = {
+        "individual_id1": [individual_ids[idx] for idx in idx_i],
+        "individual_id2": [individual_ids[idx] for idx in idx_j],
+        "genetic_id1": [samples[idx] for idx in idx_i],
+        "genetic_id2": [samples[idx] for idx in idx_j],
+        "site_overlap": site_overlaps[match_pairs],
+        "mismatch_rate": mismatch_rates[match_pairs],
+        "mismatch_rate_95_ci_lower": mismatch_rates_95_ci_lower[match_pairs],
+        "mismatch_rate_95_ci_upper": mismatch_rates_95_ci_upper[match_pairs],
+    }
+    columns.update(get_pair_metadata(metadata_columns, idx_i, idx_j))
+    columns["distance_km"] = distances[order]
+    return pd.DataFrame(columns)
 
 
 def collect_pairwise_mismatch_rates(
@@ -260,19 +300,19 @@ def collect_pairwise_mismatch_rates(
     site_overlaps: np.ndarray,
     overlap_threshold: int,
 ) -> tuple[np.ndarray, np.ndarray]:
-    individual_ids_array = np.asarray(individual_ids, dtype=object)
-    pair_i, pair_j = np.triu_indices(len(individual_ids_array), k=1)
-    pair_rates = rates[pair_i, pair_j]
-    pair_site_overlaps = site_overlaps[pair_i, pair_j]
-    individual_i = individual_ids_array[pair_i]
-    individual_j = individual_ids_array[pair_j]
-
-    valid = (
-        (pair_site_overlaps >= overlap_threshold) & ~np.isnan(pair_rates) & (individual_i != "") & (individual_j != "")
-    )
-    same_mask = valid & (individual_i == individual_j)
-    diff_mask = valid & (individual_i != individual_j)
-    return pair_rates[same_mask], pair_rates[diff_mask]
+    individual_id_codes = factorize_labels(individual_ids)
+    # As in the low-PMR finder, only unpack (i, j) for pairs that pass the numeric filters rather than
+    # building index and ID arrays for all N * (N - 1) / 2 pairs
+    valid_pairs = np.flatnonzero((site_overlaps >= overlap_threshold) & ~np.isnan(rates))
+    pair_i, pair_j = unpack_pair_indices(len(individual_id_codes), valid_pairs)
+    individual_i = individual_id_codes[pair_i]
+    individual_j = individual_id_codes[pair_j]
+    del pair_i, pair_j
+
+    labeled = (individual_i >= 0) & (individual_j >= 0)
+    same_individual = individual_i == individual_j
+    valid_rates = rates[valid_pairs]
+    return valid_rates[labeled & same_individual], valid_rates[labeled & ~same_individual]
 
 
 def plot_pairwise_mismatch_rate_histograms(
@@ -311,53 +351,72 @@ def plot_pairwise_mismatch_rate_histograms(
 
 def main() -> None:
     ensure_aadr_npz_present(AADR_NPZ_PATH, AADR_METADATA_PATH)
-    samples, site_overlaps, mismatch_rates, mismatch_rates_95_ci_lower, mismatch_rates_95_ci_upper, _covered_snps = (
-        load_aadr_npz_arrays(AADR_NPZ_PATH)
-    )
-    metadata = load_aadr_metadata(AADR_METADATA_PATH)
-    matched = sum(sample in metadata for sample in samples)
-    assert len(samples) == len(metadata) == matched == mismatch_rates.shape[0] == site_overlaps.shape[0]
+    samples = load_aadr_samples(AADR_NPZ_PATH)
+    metadata = load_aadr_metadata_frame(AADR_METADATA_PATH, fields=METADATA_COLUMN_FIELDS)
+    matched = int(pd.Index(samples).isin(metadata.index).sum())
+    assert len(samples) == len(metadata) == matched
 
+    keep_mask = get_sample_keep_mask(samples, metadata, eurasia_only=False)
+    eurasia_keep_mask = get_sample_keep_mask(samples, metadata, eurasia_only=True)
     (
-        filtered_samples,
-        filtered_site_overlaps,
-        filtered_mismatch_rates,
-        filtered_mismatch_rates_95_ci_lower,
-        filtered_mismatch_rates_95_ci_upper,
-    ) = filter_samples(
-        samples,
-        site_overlaps,
-        mismatch_rates,
-        mismatch_rates_95_ci_lower,
-        mismatch_rates_95_ci_upper,
-        metadata,
-        eurasia_only=False,
-    )
-    filtered_individual_ids = [metadata[sample][INDIVIDUAL_ID_FIELD] for sample in filtered_samples]
+        (
+            filtered_site_overlaps,
+            filtered_mismatch_rates,
+            filtered_mismatch_rates_95_ci_lower,
+            filtered_mismatch_rates_95_ci_upper,
+        ),
+        (
+            eurasia_filtered_site_overlaps,
+            eurasia_filtered_mismatch_rates,
+            eurasia_filtered_mismatch_rates_95_ci_lower,
+            eurasia_filtered_mismatch_rates_95_ci_upper,
+        ),
+    ) = load_aadr_packed_pair_arrays(AADR_NPZ_PATH, (keep_mask, eurasia_keep_mask))
+    filtered_samples = list(itertools.compress(samples, keep_mask))
+    filtered_metadata_columns = get_metadata_columns(metadata, filtered_samples)
+    filtered_individual_ids = filtered_metadata_columns[INDIVIDUAL_ID_FIELD]
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    same_rates, diff_rates = collect_pairwise_mismatch_rates(
-        filtered_individual_ids, filtered_mismatch_rates, filtered_site_overlaps, OVERLAP_THRESHOLD
-    )
-    plot_pairwise_mismatch_rate_histograms(
-        same_rates, diff_rates, SAME_INDIVIDUAL_HISTOGRAM_PATH, DIFF_INDIVIDUAL_HISTOGRAM_PATH
-    )
-    print(
-        f"Wrote pairwise mismatch rate histograms to {SAME_INDIVIDUAL_HISTOGRAM_PATH} "
-        f"and {DIFF_INDIVIDUAL_HISTOGRAM_PATH}.\n"
-    )
+    # The two finders only read the shared packed arrays and metadata columns, and spend most of their
+    # time in NumPy, which releases the GIL. Run them in the background while the histograms are plotted
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        high_pmr_future = executor.submit(
+            find_same_individual_id_high_pmr_pairs,
+            filtered_metadata_columns,
+            filtered_samples,
+            filtered_individual_ids,
+            filtered_site_overlaps,
+            filtered_mismatch_rates,
+            filtered_mismatch_rates_95_ci_lower,
+            filtered_mismatch_rates_95_ci_upper,
+            NON_IDENTICAL_PMR_THRESHOLD,
+            OVERLAP_THRESHOLD,
+        )
+        low_pmr_future = executor.submit(
+            find_diff_individual_id_low_pmr_pairs,
+            filtered_metadata_columns,
+            filtered_samples,
+            filtered_individual_ids,
+            filtered_site_overlaps,
+            filtered_mismatch_rates,
+            filtered_mismatch_rates_95_ci_lower,
+            filtered_mismatch_rates_95_ci_upper,
+            IDENTICAL_PMR_THRESHOLD,
+            OVERLAP_THRESHOLD,
+        )
+        same_rates, diff_rates = collect_pairwise_mismatch_rates(
+            filtered_individual_ids, filtered_mismatch_rates, filtered_site_overlaps, OVERLAP_THRESHOLD
+        )
+        plot_pairwise_mismatch_rate_histograms(
+            same_rates, diff_rates, SAME_INDIVIDUAL_HISTOGRAM_PATH, DIFF_INDIVIDUAL_HISTOGRAM_PATH
+        )
+        print(
+            f"Wrote pairwise mismatch rate histograms to {SAME_INDIVIDUAL_HISTOGRAM_PATH} "
+            f"and {DIFF_INDIVIDUAL_HISTOGRAM_PATH}.\n"
+        )
+        high_pmr_pairs = high_pmr_future.result()
+        low_pmr_pairs = low_pmr_future.result()
 
-    high_pmr_pairs = find_same_individual_id_high_pmr_pairs(
-        metadata,
-        filtered_samples,
-        filtered_individual_ids,
-        filtered_site_overlaps,
-        filtered_mismatch_rates,
-        filtered_mismatch_rates_95_ci_lower,
-        filtered_mismatch_rates_95_ci_upper,
-        NON_IDENTICAL_PMR_THRESHOLD,
-        OVERLAP_THRESHOLD,
-    )
     rate_cols = ["mismatch_rate", "mismatch_rate_95_ci_lower", "mismatch_rate_95_ci_upper"]
     high_pmr_pairs[rate_cols] = high_pmr_pairs[rate_cols].round(6)
     high_pmr_pairs.to_csv(SAME_INDIVIDUAL_OUTPUT_CSV, index=False)
@@ -366,17 +425,6 @@ def main() -> None:
         f"and site overlap >= {OVERLAP_THRESHOLD} to {SAME_INDIVIDUAL_OUTPUT_CSV}.\n"
     )
 
-    low_pmr_pairs = find_diff_individual_id_low_pmr_pairs(
-        metadata,
-        filtered_samples,
-        filtered_individual_ids,
-        filtered_site_overlaps,
-        filtered_mismatch_rates,
-        filtered_mismatch_rates_95_ci_lower,
-        filtered_mismatch_rates_95_ci_upper,
-        IDENTICAL_PMR_THRESHOLD,
-        OVERLAP_THRESHOLD,
-    )
     low_pmr_pairs[rate_cols] = low_pmr_pairs[rate_cols].round(6)
     low_pmr_pairs.to_csv(DIFF_INDIVIDUAL_OUTPUT_CSV, index=False)
     print(
@@ -384,28 +432,15 @@ def main() -> None:
         f"and site overlap >= {OVERLAP_THRESHOLD} to {DIFF_INDIVIDUAL_OUTPUT_CSV}.\n"
     )
 
-    (
-        eurasia_filtered_samples,
-        eurasia_filtered_site_overlaps,
-        eurasia_filtered_mismatch_rates,
-        eurasia_filtered_mismatch_rates_95_ci_lower,
-        eurasia_filtered_mismatch_rates_95_ci_upper,
-    ) = filter_samples(
-        samples,
-        site_overlaps,
-        mismatch_rates,
-        mismatch_rates_95_ci_lower,
-        mismatch_rates_95_ci_upper,
-        metadata,
-        eurasia_only=True,
-    )
-    eurasia_filtered_individual_ids = [metadata[sample][INDIVIDUAL_ID_FIELD] for sample in eurasia_filtered_samples]
-    eurasia_filtered_localities = [metadata[sample][LOCALITY_FIELD] for sample in eurasia_filtered_samples]
+    eurasia_filtered_samples = list(itertools.compress(samples, eurasia_keep_mask))
+    eurasia_filtered_metadata_columns = get_metadata_columns(metadata, eurasia_filtered_samples)
+    eurasia_filtered_individual_ids = eurasia_filtered_metadata_columns[INDIVIDUAL_ID_FIELD]
+    eurasia_filtered_localities = eurasia_filtered_metadata_columns[LOCALITY_FIELD]
     n_eurasia = len(eurasia_filtered_samples)
     n_eurasia_pairs = n_eurasia * (n_eurasia - 1) // 2
     print(f"Eurasian-filtered samples: {n_eurasia}, pairs: {n_eurasia_pairs}.\n")
     diff_locality_pairs = find_diff_locality_low_pmr_pairs(
-        metadata,
+        eurasia_filtered_metadata_columns,
         eurasia_filtered_samples,
         eurasia_filtered_individual_ids,
         eurasia_filtered_localities,
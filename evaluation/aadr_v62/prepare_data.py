@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from evaluation_utils.core import download_file
+from evaluation_utils.core import download_files_concurrently
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 REMOTE_FILES = [
@@ -24,8 +24,8 @@ REMOTE_FILES = [
 
 
 def download_aadr_dataset() -> None:
-    for file_name, url in REMOTE_FILES:
-        download_file(url, DATA_DIR / file_name)
+    # Dataverse limits bandwidth per connection, so overlap the downloads rather than running them one by one
+    download_files_concurrently([(url, DATA_DIR / file_name) for file_name, url in REMOTE_FILES])
 
 
 def main() -> None:
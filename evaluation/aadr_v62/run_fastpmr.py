@@ -6,6 +6,7 @@ from evaluation_utils.constants import (
     FASTPMR_BIN,
 )
 from evaluation_utils.core import (
+    data_file_path,
     quote_path,
     run_benchmark,
 )
@@ -15,7 +16,7 @@ AADR_V62_DATA_PREFIX = AADR_V62_DIR / "data" / "v62.0.p1_1240k_public"
 
 
 def ensure_v62_data_present() -> None:
-    data_files = [AADR_V62_DATA_PREFIX.parent / f"{AADR_V62_DATA_PREFIX.name}{ext}" for ext in AADR_EXTS]
+    data_files = [data_file_path(AADR_V62_DATA_PREFIX, ext) for ext in AADR_EXTS]
     missing = [path for path in data_files if not path.is_file()]
     if missing:
         missing_str = ", ".join(str(path) for path in missing)
@@ -10,6 +10,7 @@ from evaluation_utils.constants import (
     FASTPMR_BIN,
 )
 from evaluation_utils.core import (
+    data_file_path,
     ensure_data_present,
     quote_path,
 )
@@ -25,13 +26,13 @@ CHICHEN_ITZA_GENO_MERGED_PREFIX = CHICHEN_ITZA_GENO_DIR / "pileupcaller.merged"
 def strip_txt_suffix(prefix: Path) -> None:
     # eager's pileupcaller appends an additional .txt suffix to its EIGENSTRAT output
     for ext in EIGENSTRAT_EXTS:
-        txt_path = prefix.parent / f"{prefix.name}{ext}.txt"
+        txt_path = data_file_path(prefix, f"{ext}.txt")
         if txt_path.is_file():
-            txt_path.rename(prefix.parent / f"{prefix.name}{ext}")
+            txt_path.rename(data_file_path(prefix, ext))
 
 
 def merge_eigenstrat(single_prefix: Path, double_prefix: Path, merged_prefix: Path) -> Path:
-    par_path = merged_prefix.parent / f"{merged_prefix.name}.par"
+    par_path = data_file_path(merged_prefix, ".par")
     par_path.write_text(
         f"geno1: {single_prefix}.geno\n"
         f"snp1: {single_prefix}.snp\n"
@@ -9,6 +9,7 @@ from evaluation_utils.constants import (
     PLINK_EXTS,
 )
 from evaluation_utils.core import (
+    data_file_path,
     download_file,
     extract_files,
 )
@@ -27,8 +28,8 @@ def filter_sex_chromosomes(prefix: Path, chrs_to_exclude: set[int]) -> None:
     loci = plink_in.get_loci()
 
     with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_prefix = str(Path(tmpdir) / prefix.name)
-        plink_out = plinkfile.create(tmp_prefix, samples)
+        tmp_prefix = Path(tmpdir) / prefix.name
+        plink_out = plinkfile.create(str(tmp_prefix), samples)
         for locus, row in zip(loci, plink_in, strict=True):
             if locus.chromosome not in chrs_to_exclude:
                 plink_out.write_row(locus, row)
@@ -36,7 +37,7 @@ def filter_sex_chromosomes(prefix: Path, chrs_to_exclude: set[int]) -> None:
         plink_out.close()
 
         for ext in (".bed", ".bim", ".fam"):
-            shutil.move(tmp_prefix + ext, prefix.with_suffix(ext))
+            shutil.move(data_file_path(tmp_prefix, ext), data_file_path(prefix, ext))
 
     print(f"Filtered chromosomes {sorted(chrs_to_exclude)} from {prefix}")
 
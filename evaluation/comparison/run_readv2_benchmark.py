@@ -9,6 +9,7 @@ from evaluation_utils.constants import (
     PLINK_EXTS,
 )
 from evaluation_utils.core import (
+    data_file_path,
     ensure_data_present,
     quote_path,
     run_benchmark,
@@ -38,7 +39,7 @@ def build_fastpmr_command(prefix: Path, output_dir: Path) -> str:
     parts = [
         FASTPMR_BIN,
         # Ensure we test fastpmr on PLINK dataset, not EIGENSTRAT
-        f"--prefix {quote_path(prefix.with_suffix('.bed'))}",
+        f"--prefix {quote_path(data_file_path(prefix, '.bed'))}",
         f"--output-directory {quote_path(output_dir)}",
         "--chromosomes 1-22",
         "--min-covered-snps 0",
@@ -54,8 +55,7 @@ def build_readv2_command(readv2_script: Path, prefix: Path, work_dir: Path) -> s
 
 
 def main() -> None:
-    data_prefix = Path(COMPARISON_DATA_PREFIX)
-    ensure_data_present(data_prefix, PLINK_EXTS)
+    ensure_data_present(COMPARISON_DATA_PREFIX, PLINK_EXTS)
     clone_readv2(READV2_DIR)
 
     fastpmr_output_dir = OUTPUTS_DIR / "fastpmr"
@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 
 EVALUATION_DIR = Path(__file__).resolve().parent.parent
@@ -7,6 +8,13 @@ AADR_DATA_PREFIX = AADR_DIR / "data" / "v66.1240K.aadr.PUB"
 AADR_EXTS = (".anno", ".ind", ".snp", ".geno")
 AADR_RUNS = 1
 AADR_NPZ_PATH = AADR_DIR / "results" / "fastpmr" / "fastpmr_results.npz"
+# Symmetric (N, N) pair matrices in fastpmr's .npz output
+AADR_PAIR_ARRAY_KEYS = (
+    "n_site_overlaps",
+    "mismatch_rates",
+    "mismatch_rates_95_ci_lower",
+    "mismatch_rates_95_ci_upper",
+)
 AADR_METADATA_PATH = AADR_DIR / "data" / "v66.1240K.aadr.PUB.anno"
 # Localities with anomalously low PMRs
 AADR_ANOMALOUS_LOCALITY_PREFIXES = ("Valdescusa",)
@@ -131,9 +139,18 @@ PERFORMANCE_SAMPLE_SET_SIZES = (
     1280,
 )
 PERFORMANCE_RUNS = 3
+PERFORMANCE_WARMUP_RUNS = 2
+# Flush dirty pages and drop the page cache before each timed run (needs passwordless sudo)
+DROP_CACHES_COMMAND = (
+    "sync && sudo -n purge" if sys.platform == "darwin" else "sync && sudo -n sh -c 'echo 3 > /proc/sys/vm/drop_caches'"
+)
 
 EIGENSTRAT_EXTS = (".ind", ".snp", ".geno")
 PLINK_EXTS = (".bed", ".bim", ".fam")
+# Minimum gap between starting download requests, to avoid servers' rate-limiting 403s
+DOWNLOAD_REQUEST_SPACING_S = 2
+# Buffer size for streaming archive members to disk
+EXTRACT_CHUNK_SIZE = 4 * 1024 * 1024
 CSV_FIELDS = [
     "label",
     "mean_s",
@@ -3,44 +3,56 @@ import json
 import multiprocessing
 import resource
 import shlex
+import shutil
 import statistics
 import subprocess
 import sys
 import tarfile
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing.connection import Connection
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 import reverse_geocoder as rg
 
 from evaluation_utils.constants import (
     AADR_DATA_PREFIX,
     AADR_METADATA_PATH,
     AADR_NPZ_PATH,
+    AADR_PAIR_ARRAY_KEYS,
     CHICHEN_ITZA_GENO_DIR,
     COMPARISON_DATA_PREFIX,
     COUNTRY_TO_REGION,
     CSV_FIELDS,
+    DOWNLOAD_REQUEST_SPACING_S,
     EIGENSTRAT_EXTS,
+    EXTRACT_CHUNK_SIZE,
     GROUP_ID_FIELD,
     US_OCEANIA_ADMIN1,
 )
 
 
 def download_file(url: str, destination: Path) -> None:
+    # Completed downloads are renamed into place from a .part file, so an existing non-empty
+    # destination is a finished download from an earlier run
+    if destination.is_file() and destination.stat().st_size > 0:
+        print(f"Already present: {destination}\n")
+        return
     print(f"Downloading {url}...")
     destination.parent.mkdir(parents=True, exist_ok=True)
-    # Space out requests to lighten server load and avoid the rate-limiting 403s the ENA server
-    # returns when many files are fetched back-to-back
-    time.sleep(2)
+    # Space out requests from sequential callers to lighten server load and avoid the rate-limiting
+    # 403s the ENA server returns when many files are fetched back-to-back. Concurrent callers go
+    # through download_files_concurrently, which staggers the calls themselves
+    time.sleep(DOWNLOAD_REQUEST_SPACING_S)
     # Download to a temporary file and rename only on success, so an interrupted download
     # never leaves a partial file at the final path
     partial = destination.with_name(destination.name + ".part")
     # The ENA server drops large transfers mid-download. wget retries and resumes within this single
     # invocation by default, so progress accumulates across drops until the file completes. Omitting
-    # -c redownloads from scratch so that every run downloads fresh, and -O writes that fresh download
+    # -c restarts a .part left by an interrupted run from scratch, and -O writes that fresh download
     # over our .part instead of a new .part.1. The server also returns transient 403/5xx under load,
     # which wget treats as fatal unless the codes are listed in --retry-on-http-error.
     subprocess.run(
@@ -62,6 +74,19 @@ def download_file(url: str, destination: Path) -> None:
     print(f"Downloaded {url} -> {destination}\n")
 
 
+def download_files_concurrently(downloads: list[tuple[str, Path]]) -> None:
+    # Overlap the transfers, since some servers limit bandwidth per connection, but start each call
+    # DOWNLOAD_REQUEST_SPACING_S after the previous one so requests still reach the server spaced out
+    with ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+        futures = []
+        for i, (url, destination) in enumerate(downloads):
+            if i > 0:
+                time.sleep(DOWNLOAD_REQUEST_SPACING_S)
+            futures.append(executor.submit(download_file, url, destination))
+        for future in futures:
+            future.result()
+
+
 def extract_files(archive_path: Path, destination: Path, prefix: Path, exts: tuple[str, ...]) -> None:
     destination.mkdir(parents=True, exist_ok=True)
     target_exts = set(exts)
@@ -72,17 +97,18 @@ def extract_files(archive_path: Path, destination: Path, prefix: Path, exts: tup
             for member in zf.namelist():
                 path = Path(member)
                 if path.suffix in target_exts:
-                    out_path = prefix.with_name(prefix.name + path.suffix)
-                    out_path.write_bytes(zf.read(member))
+                    out_path = data_file_path(prefix, path.suffix)
+                    with zf.open(member) as file_obj, out_path.open("wb") as out:
+                        shutil.copyfileobj(file_obj, out, EXTRACT_CHUNK_SIZE)
                     extracted.append(out_path.name)
     elif "".join(archive_path.suffixes[-2:]) == ".tar.gz":
         with tarfile.open(archive_path, "r:gz") as tar:
             for member in tar.getmembers():
                 path = Path(member.name)
                 if path.suffix in target_exts:
-                    out_path = prefix.with_name(prefix.name + path.suffix)
-                    file_obj = tar.extractfile(member)
-                    out_path.write_bytes(file_obj.read())
+                    out_path = data_file_path(prefix, path.suffix)
+                    with tar.extractfile(member) as file_obj, out_path.open("wb") as out:
+                        shutil.copyfileobj(file_obj, out, EXTRACT_CHUNK_SIZE)
                     extracted.append(out_path.name)
     else:
         raise ValueError(f"Unsupported archive format: {archive_path.suffix}")
@@ -112,7 +138,7 @@ def load_aadr_samples(npz_path: Path = AADR_NPZ_PATH) -> list[str]:
 def load_aadr_npz_arrays(
     npz_path: Path = AADR_NPZ_PATH,
 ) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-    with np.load(npz_path, allow_pickle=False) as npz:
+    with np.load(npz_path) as npz:
         site_overlaps = npz["n_site_overlaps"]
         mismatch_rates = npz["mismatch_rates"]
         mismatch_rates_95_ci_lower = npz["mismatch_rates_95_ci_lower"]
@@ -122,16 +148,81 @@ def load_aadr_npz_arrays(
     return samples, site_overlaps, mismatch_rates, mismatch_rates_95_ci_lower, mismatch_rates_95_ci_upper, covered_snps
 
 
+def packed_pair_index(n_samples: int, i: int | np.ndarray, j: int | np.ndarray) -> int | np.ndarray:
+    # Position of pair (i, j), i < j, in the packed strict upper triangle of an (n_samples, n_samples)
+    # matrix, i.e. in matrix[np.triu_indices(n_samples, k=1)]
+    return i * (2 * n_samples - i - 1) // 2 + (j - i - 1)
+
+
+def unpack_pair_indices(n_samples: int, pairs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Inverse of packed_pair_index: recover (i, j) for positions in a packed strict upper triangle
+    first = np.arange(n_samples - 1)
+    row_starts = packed_pair_index(n_samples, first, first + 1)
+    i = np.searchsorted(row_starts, pairs, side="right") - 1
+    j = pairs - row_starts[i] + i + 1
+    return i, j
+
+
+def load_aadr_packed_pair_arrays(
+    npz_path: Path,
+    keep_masks: tuple[np.ndarray, ...],
+) -> list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Load the pair matrices restricted to each mask's samples, as packed strict upper triangles.
+
+    Returns one (site_overlaps, mismatch_rates, mismatch_rates_95_ci_lower, mismatch_rates_95_ci_upper)
+    tuple per mask. np.load decompresses .npz members lazily, so only one full (N, N) matrix is held at a
+    time. The matrices are symmetric, so each selection keeps every pair once, in packed_pair_index order.
+    """
+    keep_indices_per_mask = [np.flatnonzero(keep_mask) for keep_mask in keep_masks]
+    packed: list[list[np.ndarray]] = [[] for _ in keep_masks]
+    with np.load(npz_path) as npz:
+        for key in AADR_PAIR_ARRAY_KEYS:
+            matrix = npz[key]
+            for arrays, keep_mask, keep_indices in zip(packed, keep_masks, keep_indices_per_mask, strict=True):
+                assert matrix.shape == (len(keep_mask), len(keep_mask))
+                arrays.append(pack_upper_triangle(matrix, keep_indices))
+            del matrix
+    return [tuple(arrays) for arrays in packed]
+
+
+def pack_upper_triangle(matrix: np.ndarray, keep_indices: np.ndarray) -> np.ndarray:
+    # Equivalent to matrix[np.ix_(keep_indices, keep_indices)][np.triu_indices(K, k=1)], filled one kept
+    # row at a time so no (K, K) block or K * (K - 1) / 2 index arrays are materialized
+    n_kept = len(keep_indices)
+    packed = np.empty(n_kept * (n_kept - 1) // 2, dtype=matrix.dtype)
+    start = 0
+    for r in range(n_kept - 1):
+        stop = start + n_kept - r - 1
+        packed[start:stop] = matrix[keep_indices[r], keep_indices[r + 1 :]]
+        start = stop
+    return packed
+
+
+def factorize_labels(labels: list[str]) -> np.ndarray:
+    # int32 codes numbered by first appearance, with empty labels coded -1, so that label comparisons
+    # across many pairs are integer comparisons rather than per-element Python string comparisons
+    labels_array = np.asarray(labels, dtype=object)
+    codes, _ = pd.factorize(labels_array)
+    codes = codes.astype(np.int32)
+    codes[labels_array == ""] = -1
+    return codes
+
+
+def load_aadr_metadata_frame(
+    metadata_path: Path = AADR_METADATA_PATH, fields: tuple[str, ...] | None = None
+) -> pd.DataFrame:
+    # Keep every field as a raw string and index rows by the first (genetic ID) column.
+    # If fields is given, only parse those columns (plus the ID column) from the .anno file
+    usecols = None
+    if fields is not None:
+        id_field = pd.read_csv(metadata_path, sep="\t", nrows=0).columns[0]
+        usecols = [id_field, *(field for field in fields if field != id_field)]
+    metadata = pd.read_csv(metadata_path, sep="\t", dtype=str, na_filter=False, usecols=usecols)
+    return metadata.set_index(metadata.columns[0], drop=False)
+
+
 def load_aadr_metadata(metadata_path: Path = AADR_METADATA_PATH) -> dict[str, dict[str, str]]:
-    with metadata_path.open(newline="") as handle:
-        reader = csv.reader(handle, delimiter="\t")
-        header = next(reader)
-        metadata = {}
-        for row in reader:
-            if not row:
-                continue
-            metadata[row[0]] = dict(zip(header, row, strict=True))
-    return metadata
+    return load_aadr_metadata_frame(metadata_path).to_dict(orient="index")
 
 
 def is_archaic_or_reference_sample(sample: str, sample_metadata: dict[str, str]) -> bool:
@@ -143,11 +234,18 @@ def is_archaic_or_reference_sample(sample: str, sample_metadata: dict[str, str])
     return False
 
 
-def ensure_data_present(prefix: Path, exts: tuple[str, ...] = EIGENSTRAT_EXTS) -> None:
-    def data_file(ext: str) -> Path:
-        return prefix.parent / f"{prefix.name}{ext}"
+def data_file_path(prefix: Path, ext: str) -> Path:
+    # Append ext to the full prefix name. Path.with_suffix would replace anything after the
+    # last dot, which breaks prefixes like v62.0.p1_1240k_public
+    return prefix.parent / f"{prefix.name}{ext}"
+
 
-    missing = [data_file(ext) for ext in exts if not data_file(ext).is_file()]
+def ensure_data_present(prefix: Path, exts: tuple[str, ...] = EIGENSTRAT_EXTS) -> None:
+    missing = []
+    for ext in exts:
+        path = data_file_path(prefix, ext)
+        if not path.is_file():
+            missing.append(path)
     if missing:
         missing_str = ", ".join(str(path) for path in missing)
         if prefix == AADR_DATA_PREFIX:
@@ -178,9 +276,10 @@ def classify_coords(coords: list[tuple[float, float]]) -> list[str]:
     return regions
 
 
-def measure_worker(command: str, conn: Connection) -> None:
+def measure_worker(command: str | list[str], conn: Connection) -> None:
     start = time.perf_counter()
-    subprocess.run(command, shell=True, check=True)
+    # Argument lists are executed directly, skipping the /bin/sh startup that shell strings need
+    subprocess.run(command, shell=isinstance(command, str), check=True)
     runtime = time.perf_counter() - start
 
     usage = resource.getrusage(resource.RUSAGE_CHILDREN)
@@ -191,7 +290,7 @@ def measure_worker(command: str, conn: Connection) -> None:
     conn.close()
 
 
-def measure_command(command: str) -> dict[str, float]:
+def measure_command(command: str | list[str]) -> dict[str, float]:
     ctx = multiprocessing.get_context("spawn")
     parent_conn, child_conn = ctx.Pipe(duplex=False)
     proc = ctx.Process(target=measure_worker, args=(command, child_conn))
@@ -205,37 +304,120 @@ def measure_command(command: str) -> dict[str, float]:
     return result
 
 
+def benchmark_config(
+    label: str,
+    command: str | list[str],
+    runs: int,
+    warmup: int = 0,
+    prepare: str | None = None,
+    progress: str = "",
+) -> dict[str, str | float | list[float]]:
+    runtimes = []
+    peak_bytes_list = []
+    # Untimed runs first so cold page cache and binary loading don't land in the first trial
+    for trial in range(1, warmup + 1):
+        print(f"\n{progress}{label} (warmup {trial}/{warmup})")
+        measure_command(command)
+    for trial in range(1, runs + 1):
+        print(f"\n{progress}{label} (trial {trial}/{runs})")
+        if prepare is not None:
+            subprocess.run(prepare, shell=True, check=True)
+        result = measure_command(command)
+        runtimes.append(result["runtime"])
+        peak_bytes_list.append(result["peak_bytes"])
+    return summarize_trials(label, runtimes, peak_bytes_list)
+
+
+def benchmark_configs_interleaved(
+    configs: list[tuple[str, str | list[str]]],
+    runs: int,
+    warmup: int = 0,
+    prepare: str | None = None,
+) -> list[dict[str, str | float | list[float]]]:
+    total = len(configs)
+    for i, (label, command) in enumerate(configs, 1):
+        for trial in range(1, warmup + 1):
+            print(f"\n[{i}/{total}] {label} (warmup {trial}/{warmup})")
+            measure_command(command)
+    runtimes = [[] for _ in configs]
+    peak_bytes_lists = [[] for _ in configs]
+    # One trial of every config per round, so each config's trials are spread over the whole benchmark
+    # and a transient slowdown hits all configs alike instead of one config's consecutive trials
+    for trial in range(1, runs + 1):
+        for i, (label, command) in enumerate(configs):
+            print(f"\n[{i + 1}/{total}] {label} (trial {trial}/{runs})")
+            if prepare is not None:
+                subprocess.run(prepare, shell=True, check=True)
+            result = measure_command(command)
+            runtimes[i].append(result["runtime"])
+            peak_bytes_lists[i].append(result["peak_bytes"])
+    return [
+        summarize_trials(label, config_runtimes, config_peak_bytes)
+        for (label, _), config_runtimes, config_peak_bytes in zip(configs, runtimes, peak_bytes_lists, strict=True)
+    ]
+
+
+def summarize_trials(
+    label: str, runtimes: list[float], peak_bytes_list: list[float]
+) -> dict[str, str | float | list[float]]:
+    return {
+        "label": label,
+        "mean_s": statistics.mean(runtimes),
+        "stddev_s": statistics.stdev(runtimes) if len(runtimes) > 1 else 0.0,
+        "min_s": min(runtimes),
+        "max_s": max(runtimes),
+        "mean_bytes": statistics.mean(peak_bytes_list),
+        "stddev_bytes": statistics.stdev(peak_bytes_list) if len(peak_bytes_list) > 1 else 0.0,
+        "min_bytes": min(peak_bytes_list),
+        "max_bytes": max(peak_bytes_list),
+        "runtimes_s": runtimes,
+        "peak_bytes": peak_bytes_list,
+    }
+
+
 def run_benchmark(
-    configs: list[tuple[str, str]],
+    configs: list[tuple[str, str | list[str]]],
     output_path: Path,
     runs: int,
+    warmup: int = 0,
+    prepare: str | None = None,
+    max_workers: int = 1,
+    json_output_path: Path | None = None,
+    parameters: list[dict[str, int]] | None = None,
+    interleave: bool = False,
 ) -> None:
+    if interleave and max_workers != 1:
+        raise ValueError("Interleaved trials must run one at a time; use max_workers=1 with interleave")
+    if prepare is not None and max_workers != 1:
+        # A prepare step such as dropping the page cache would run while other configs' trials are timed
+        raise ValueError("A prepare command needs trials to run one at a time; use max_workers=1 with prepare")
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    rows = []
     total = len(configs)
-    for i, (label, command) in enumerate(configs, 1):
-        runtimes = []
-        peak_bytes_list = []
-        for trial in range(1, runs + 1):
-            print(f"\n[{i}/{total}] {label} (trial {trial}/{runs})")
-            result = measure_command(command)
-            runtimes.append(result["runtime"])
-            peak_bytes_list.append(result["peak_bytes"])
-        rows.append(
-            {
-                "label": label,
-                "mean_s": statistics.mean(runtimes),
-                "stddev_s": statistics.stdev(runtimes) if len(runtimes) > 1 else 0.0,
-                "min_s": min(runtimes),
-                "max_s": max(runtimes),
-                "mean_bytes": statistics.mean(peak_bytes_list),
-                "stddev_bytes": statistics.stdev(peak_bytes_list) if len(peak_bytes_list) > 1 else 0.0,
-                "min_bytes": min(peak_bytes_list),
-                "max_bytes": max(peak_bytes_list),
-            }
-        )
+
+    def run_config(i: int, config: tuple[str, str | list[str]]) -> dict[str, str | float | list[float]]:
+        label, command = config
+        return benchmark_config(label, command, runs, warmup, prepare, progress=f"[{i}/{total}] ")
+
+    if interleave:
+        rows = benchmark_configs_interleaved(configs, runs, warmup, prepare)
+    elif max_workers == 1:
+        rows = [run_config(i, config) for i, config in enumerate(configs, 1)]
+    else:
+        # Benchmark several configs at once. Each measurement runs in its own process, so threads
+        # are enough to overlap them. Timings then reflect a machine shared between the configs
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            rows = list(executor.map(run_config, range(1, total + 1), configs))
     with output_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
         writer.writeheader()
         writer.writerows(rows)
     print(f"\nResults written to {output_path}")
+
+    if json_output_path is not None:
+        # Same summary as the CSV plus per-trial measurements and typed sweep parameters, so consumers
+        # don't have to parse them back out of labels
+        if parameters is not None:
+            rows = [{**row, "parameters": params} for row, params in zip(rows, parameters, strict=True)]
+        json_output_path.parent.mkdir(parents=True, exist_ok=True)
+        json_output_path.write_text(json.dumps({"results": rows}, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {json_output_path}")
@@ -8,6 +8,7 @@ from evaluation_utils.constants import (
     PERFORMANCE_SAMPLE_SET_SIZES,
 )
 from evaluation_utils.core import (
+    data_file_path,
     download_file,
     extract_files,
 )
@@ -34,7 +35,7 @@ def format_pair_count(size: int) -> str:
 
 
 def generate_sample_sets(prefix: Path, sample_dir: Path) -> None:
-    samples = read_sample_ids(prefix.with_suffix(".ind"))
+    samples = read_sample_ids(data_file_path(prefix, ".ind"))
     rng = random.Random(SAMPLE_SHUFFLE_SEED)
     shuffled = samples.copy()
     rng.shuffle(shuffled)
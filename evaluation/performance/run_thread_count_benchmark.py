@@ -30,8 +30,7 @@ def build_command(prefix: Path, threads: int, output_dir: Path) -> str:
 
 
 def main() -> None:
-    data_prefix = Path(PERFORMANCE_DATA_PREFIX)
-    ensure_data_present(data_prefix)
+    ensure_data_present(PERFORMANCE_DATA_PREFIX)
 
     results_dir = PERFORMANCE_DIR / "results"
     export_path = results_dir / "thread_count_benchmark.csv"
@@ -39,7 +38,7 @@ def main() -> None:
     configs = []
     for count in THREAD_COUNTS:
         output_dir = tempfile.mkdtemp()
-        command = build_command(data_prefix, count, output_dir)
+        command = build_command(PERFORMANCE_DATA_PREFIX, count, output_dir)
         configs.append((f"threads={count}", command))
     run_benchmark(configs, export_path, runs=PERFORMANCE_RUNS)
 
@@ -1,61 +1,116 @@
+import os
+import random
 import tempfile
 from pathlib import Path
 
 from evaluation_utils.constants import (
+    DROP_CACHES_COMMAND,
     FASTPMR_BIN,
     PERFORMANCE_DATA_PREFIX,
     PERFORMANCE_DIR,
     PERFORMANCE_RUNS,
+    PERFORMANCE_WARMUP_RUNS,
 )
 from evaluation_utils.core import (
     ensure_data_present,
-    quote_path,
     run_benchmark,
 )
 
-VARIANT_SPECS = (
-    "1-100000",
-    "1-200000",
-    "1-300000",
-    "1-400000",
-    "1-500000",
-    "1-600000",
-    "1-700000",
-    "1-800000",
-    "1-900000",
-    "1-1000000",
-    "1-1100000",
-    "1-1150639",  # Run all autosomal variants
-)
+# Threads given to each fastpmr run when PARALLEL=1 runs several variant counts at once
+PARALLEL_THREADS_PER_RUN = 4
+VARIANT_COUNT_STEP = 100_000
+AUTOSOMAL_VARIANT_COUNT = 1_150_639
+# Each run uses the first N variants, i.e. --variant-indices 1-N, stepping up to a final run over
+# all autosomal variants
+VARIANT_COUNTS = (*range(VARIANT_COUNT_STEP, AUTOSOMAL_VARIANT_COUNT, VARIANT_COUNT_STEP), AUTOSOMAL_VARIANT_COUNT)
 
 
-def build_command(prefix: Path, spec: str, output_dir: Path) -> str:
-    parts = [
+def build_command(prefix: Path, variant_count: int, output_dir: Path, threads: int | None = None) -> list[str]:
+    command = [
         FASTPMR_BIN,
-        f"--prefix {quote_path(prefix)}",
-        f"--output-directory {quote_path(output_dir)}",
-        f"--variant-indices {spec}",
-        "--chromosomes 1-22",
-        "--min-covered-snps 0",
+        "--prefix",
+        str(prefix),
+        "--output-directory",
+        str(output_dir),
+        "--variant-indices",
+        f"1-{variant_count}",
+        "--chromosomes",
+        "1-22",
+        "--min-covered-snps",
+        "0",
         "--npz",
     ]
-    return " ".join(parts)
+    if threads is not None:
+        command += ["--threads", str(threads)]
+    return command
 
 
 def main() -> None:
-    variant_specs = list(VARIANT_SPECS)
-    data_prefix = Path(PERFORMANCE_DATA_PREFIX)
-    ensure_data_present(data_prefix)
+    ensure_data_present(PERFORMANCE_DATA_PREFIX)
 
+    # With CLEAR_CACHES=1, every timed run starts from a cold page cache instead of reusing the input
+    # files cached by earlier specs. Cold results go to a separate CSV so the default warm results are kept
+    clear_caches = os.environ.get("CLEAR_CACHES") == "1"
+    # With PARALLEL=1, variant counts are benchmarked concurrently with a fixed number of threads each,
+    # as many at a time as fit on the machine. This is faster but measures contended throughput, so
+    # results go to a separate CSV
+    parallel = os.environ.get("PARALLEL") == "1"
+    if clear_caches and parallel:
+        # Dropping the page cache before one count's trial would also evict the inputs of runs in progress
+        raise SystemExit("CLEAR_CACHES=1 needs sequential runs and can't be combined with PARALLEL=1.")
+    # With INTERLEAVE=1, each round runs every variant count once instead of running all trials of one
+    # count back to back, so transient system load is spread across counts rather than skewing one of them
+    interleave = os.environ.get("INTERLEAVE") == "1"
+    if interleave and parallel:
+        raise SystemExit("INTERLEAVE=1 needs sequential runs and can't be combined with PARALLEL=1.")
+    max_workers = (os.cpu_count() or 1) // PARALLEL_THREADS_PER_RUN if parallel else 1
+    if parallel and max_workers < 2:
+        # Too few cores to run two counts at once; a one-at-a-time run pinned to fewer threads would be
+        # neither the default measurement nor a parallel one
+        print(
+            f"PARALLEL=1 needs at least {2 * PARALLEL_THREADS_PER_RUN} cores to run variant counts concurrently; "
+            "running sequentially instead."
+        )
+        parallel = False
+        max_workers = 1
+    threads = PARALLEL_THREADS_PER_RUN if parallel else None
     results_dir = PERFORMANCE_DIR / "results"
-    export_path = results_dir / "variant_count_benchmark.csv"
-
-    configs = []
-    for spec in variant_specs:
-        output_dir = tempfile.mkdtemp()
-        command = build_command(data_prefix, spec, output_dir)
-        configs.append((f"variants={spec}", command))
-    run_benchmark(configs, export_path, runs=PERFORMANCE_RUNS)
+    export_name = "variant_count_benchmark"
+    if clear_caches:
+        export_name += "_cold"
+    if parallel:
+        export_name += "_parallel"
+    export_path = results_dir / f"{export_name}.csv"
+    json_export_path = results_dir / f"{export_name}.json"
+
+    # Benchmark variant counts in random order so slow drift over the sweep (thermal throttling,
+    # background load) shows up as noise rather than as a trend along the variant count axis.
+    # Set SEED to reproduce an earlier order
+    seed = int(os.environ.get("SEED", random.randrange(2**32)))
+    print(f"Shuffling variant counts with SEED={seed}")
+    variant_counts = list(VARIANT_COUNTS)
+    random.Random(seed).shuffle(variant_counts)
+
+    # All runs write under one scratch directory, which is removed once the sweep finishes. Each variant
+    # count gets its own subdirectory so concurrent runs don't overwrite each other's output
+    with tempfile.TemporaryDirectory() as output_dir:
+        configs = []
+        for variant_count in variant_counts:
+            run_output_dir = Path(output_dir) / str(variant_count)
+            run_output_dir.mkdir()
+            command = build_command(PERFORMANCE_DATA_PREFIX, variant_count, run_output_dir, threads)
+            configs.append((f"variants=1-{variant_count}", command))
+        run_benchmark(
+            configs,
+            export_path,
+            runs=PERFORMANCE_RUNS,
+            warmup=0 if clear_caches else PERFORMANCE_WARMUP_RUNS,
+            prepare=DROP_CACHES_COMMAND if clear_caches else None,
+            max_workers=max_workers,
+            json_output_path=json_export_path,
+            parameters=[{"variant_count": variant_count} for variant_count in variant_counts],
+            interleave=interleave,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+"""
+Tests for data file path construction and presence checks.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from evaluation_utils.constants import EIGENSTRAT_EXTS
+from evaluation_utils.core import data_file_path, ensure_data_present
+
+
+def test_data_file_path_keeps_dots_in_prefix(tmp_path: Path) -> None:
+    prefix = tmp_path / "v62.0.p1_1240k_public"
+    assert data_file_path(prefix, ".geno") == tmp_path / "v62.0.p1_1240k_public.geno"
+
+
+def test_ensure_data_present_accepts_dotted_prefix(tmp_path: Path) -> None:
+    prefix = tmp_path / "v62.0.p1_1240k_public"
+    for ext in EIGENSTRAT_EXTS:
+        data_file_path(prefix, ext).touch()
+    ensure_data_present(prefix, EIGENSTRAT_EXTS)
+
+
+def test_ensure_data_present_reports_missing_files(tmp_path: Path) -> None:
+    prefix = tmp_path / "v62.0.p1_1240k_public"
+    data_file_path(prefix, EIGENSTRAT_EXTS[0]).touch()
+    with pytest.raises(SystemExit) as excinfo:
+        ensure_data_present(prefix, EIGENSTRAT_EXTS)
+    message = str(excinfo.value)
+    for ext in EIGENSTRAT_EXTS[1:]:
+        assert str(data_file_path(prefix, ext)) in message
+    assert str(data_file_path(prefix, EIGENSTRAT_EXTS[0])) not in message
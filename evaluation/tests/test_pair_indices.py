@@ -0,0 +1,81 @@
+"""
+Tests for the packed upper-triangle pair index helpers and packed pair array loading.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from evaluation_utils.constants import AADR_PAIR_ARRAY_KEYS
+from evaluation_utils.core import (
+    factorize_labels,
+    load_aadr_packed_pair_arrays,
+    pack_upper_triangle,
+    packed_pair_index,
+    unpack_pair_indices,
+)
+
+
+@pytest.mark.parametrize("n_samples", [0, 1, 2, 3, 10, 257])
+def test_packed_pair_index_matches_triu_order(n_samples: int) -> None:
+    pair_i, pair_j = np.triu_indices(n_samples, k=1)
+    packed = packed_pair_index(n_samples, pair_i, pair_j)
+    np.testing.assert_array_equal(packed, np.arange(len(pair_i)))
+
+
+@pytest.mark.parametrize("n_samples", [0, 1, 2, 3, 10, 257])
+def test_unpack_pair_indices_round_trips(n_samples: int) -> None:
+    pair_i, pair_j = np.triu_indices(n_samples, k=1)
+    unpacked_i, unpacked_j = unpack_pair_indices(n_samples, np.arange(len(pair_i)))
+    np.testing.assert_array_equal(unpacked_i, pair_i)
+    np.testing.assert_array_equal(unpacked_j, pair_j)
+
+
+def test_packed_pair_index_selects_matrix_entries() -> None:
+    """Packed vectors hold the same values as the full symmetric matrix."""
+    rng = np.random.default_rng(0)
+    n_samples = 6
+    upper = np.triu(rng.random((n_samples, n_samples)), k=1)
+    matrix = upper + upper.T
+    packed = matrix[np.triu_indices(n_samples, k=1)]
+    assert packed[packed_pair_index(n_samples, 2, 5)] == matrix[2, 5] == matrix[5, 2]
+
+
+def test_load_aadr_packed_pair_arrays_matches_masked_triu(tmp_path: Path) -> None:
+    rng = np.random.default_rng(1)
+    n_samples = 9
+    matrices = {}
+    for key in AADR_PAIR_ARRAY_KEYS:
+        # Non-symmetric values so that swapping row and column indices would be caught
+        matrices[key] = rng.random((n_samples, n_samples)).astype(np.float32)
+    npz_path = tmp_path / "fastpmr_results.npz"
+    np.savez_compressed(npz_path, **matrices)
+
+    keep_masks = (
+        np.array([True, False, True, True, False, True, True, False, True]),
+        np.array([False, True, False, False, True, True, False, False, False]),
+    )
+    packed = load_aadr_packed_pair_arrays(npz_path, keep_masks)
+
+    assert len(packed) == len(keep_masks)
+    for arrays, keep_mask in zip(packed, keep_masks, strict=True):
+        keep = np.flatnonzero(keep_mask)
+        for array, key in zip(arrays, AADR_PAIR_ARRAY_KEYS, strict=True):
+            expected = matrices[key][np.ix_(keep, keep)][np.triu_indices(len(keep), k=1)]
+            assert array.dtype == np.float32
+            np.testing.assert_array_equal(array, expected)
+
+
+@pytest.mark.parametrize("n_kept", [0, 1, 2, 5])
+def test_pack_upper_triangle_handles_small_selections(n_kept: int) -> None:
+    matrix = np.arange(36).reshape(6, 6)
+    keep = np.arange(n_kept)
+    expected = matrix[np.ix_(keep, keep)][np.triu_indices(n_kept, k=1)]
+    np.testing.assert_array_equal(pack_upper_triangle(matrix, keep), expected)
+
+
+def test_factorize_labels_codes_by_first_appearance() -> None:
+    codes = factorize_labels(["b", "a", "", "b", "c", "", "a"])
+    assert codes.dtype == np.int32
+    np.testing.assert_array_equal(codes, [0, 1, -1, 0, 3, -1, 1])
@@ -235,7 +235,6 @@ impl Counts {
     // assuming pseudohaploid data where each site is one independent observation
     pub fn confidence_intervals_95(&self) -> ConfidenceIntervals {
         let size = self.n_samples * self.n_samples;
-        let site_overlaps = self.site_overlaps();
         let mut lower = vec![0.0f32; size];
         let mut upper = vec![0.0f32; size];
         let z = 1.96_f64;
@@ -244,12 +243,14 @@ impl Counts {
         for i in 0..self.n_samples {
             for j in (i + 1)..self.n_samples {
                 let pair_idx = self.pair_idx(i, j);
-                if site_overlaps[pair_idx] == 0 {
+                // Read the overlap straight from totals rather than materializing site_overlaps()
+                let site_overlap = self.totals[pair_idx] / 2;
+                if site_overlap == 0 {
                     lower[pair_idx] = f32::NAN;
                     upper[pair_idx] = f32::NAN;
                 } else {
                     // For n, assume pseudohaploid data where each site is one independent observation
-                    let n = site_overlaps[pair_idx] as f64;
+                    let n = site_overlap as f64;
                     let p = self.mismatches[pair_idx] as f64 / self.totals[pair_idx] as f64;
                     let denom = 1.0 + z_squared / n;
                     let center = (p + z_squared / (2.0 * n)) / denom;
@@ -448,4 +449,28 @@ mod tests {
         assert!(ci.lower[pair_idx].is_nan());
         assert!(ci.upper[pair_idx].is_nan());
     }
+
+    #[test]
+    fn confidence_intervals_95_nan_for_uncounted_pairs() {
+        let samples = vec!["A".to_string(), "B".to_string(), "C".to_string()];
+        let mut indices_to_count = HashSet::new();
+        indices_to_count.insert((1, 2));
+        let mut reader = build_test_reader();
+        let counts = Counts::new(
+            samples.clone(),
+            Some(indices_to_count),
+            vec![0; samples.len()],
+        )
+        .consume_reader(&mut reader)
+        .expect("counts failed");
+
+        let ci = counts.confidence_intervals_95();
+
+        let pair_idx_ab = counts.pair_idx(0, 1);
+        assert!(ci.lower[pair_idx_ab].is_nan());
+        assert!(ci.upper[pair_idx_ab].is_nan());
+        let pair_idx_bc = counts.pair_idx(1, 2);
+        assert!((ci.lower[pair_idx_bc] - 0.0945).abs() < 1e-3);
+        assert!((ci.upper[pair_idx_bc] - 0.9055).abs() < 1e-3);
+    }
 }